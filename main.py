@@ -1,5 +1,11 @@
 import os
+import sys
 import json
+import asyncio
+import hashlib
+import math
+import tempfile
+from dataclasses import dataclass
 import openai
 from dotenv import load_dotenv
 load_dotenv()  # this will load OPENAI_API_KEY from .env
@@ -21,23 +27,336 @@ These additions would make the system more robust, user-friendly, and closer to
 """
 
 
-def call_model(prompt: str, max_tokens=3000, temperature=0.1) -> str:
-    # please use your own openai api key here.
-    openai.api_key = os.getenv("OPENAI_API_KEY")
-    # openai.api_key = os.getenv("OPENAI_API_KEY")
-    resp = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}],
-        stream=False,
+# A single shared async client, built lazily on first use so the module can be
+# imported without an API key. The key is read once, and the client's HTTP
+# connection pool keeps TLS connections alive across calls instead of
+# re-handshaking on each request. It is closed when the session ends.
+_client: openai.AsyncOpenAI | None = None
+
+
+def get_client() -> openai.AsyncOpenAI:
+    """Return the shared async OpenAI client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client (if it was created) and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+# Caps the number of in-flight requests when agents are fanned out in parallel,
+# so we stay within OpenAI rate limits.
+MAX_CONCURRENT_REQUESTS = 8
+_request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+# The assignment requires gpt-3.5-turbo, so both agents use it for now; the
+# per-agent constants make it a one-line change to give the writer a stronger
+# model or the judge a cheaper one.
+MODEL = "gpt-3.5-turbo"
+WRITER_MODEL = MODEL
+JUDGE_MODEL = MODEL
+
+# Sampling settings for the story-writing agents (also used by
+# scripts/batch_eval.py, so offline evals match the interactive pipeline).
+STORY_MAX_TOKENS = 900
+WRITER_TEMPERATURE = 0.8
+REWRITE_TEMPERATURE = 0.7
+
+# Exact-match response cache: identical (model, prompt, params) requests are
+# answered from memory instead of hitting the API again.
+_response_cache: dict[str, list[str]] = {}
+
+
+def _cache_key(
+    messages: list[dict],
+    max_tokens: int,
+    temperature: float,
+    response_format: dict | None = None,
+    n: int = 1,
+    model: str = MODEL,
+) -> str:
+    """
+    Build a SHA-256 cache key from the request parameters.
+
+    Whitespace in message contents is collapsed first so prompts that only
+    differ in spacing/newlines share the same entry.
+    """
+    normalized = [
+        {"role": m["role"], "content": " ".join(m["content"].split())}
+        for m in messages
+    ]
+    payload = {
+        "model": model,
+        "messages": normalized,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+    }
+    if response_format is not None:
+        payload["response_format"] = response_format
+    if n != 1:
+        payload["n"] = n
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _build_messages(prompt: str, system: str | None, followup: list[dict] | None = None) -> list[dict]:
+    messages = []
+    if system:
+        # Static instructions go first so they form a stable prompt prefix.
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+    # Optional extra turns after the prompt (e.g. a bad reply and a correction)
+    messages.extend(followup or [])
+    return messages
+
+
+async def acall_model_choices(
+    prompt: str,
+    system: str | None = None,
+    n: int = 1,
+    max_tokens=3000,
+    temperature=0.1,
+    response_format: dict | None = None,
+    model: str = MODEL,
+    followup: list[dict] | None = None,
+) -> list[str]:
+    """
+    Sample `n` completions for the same prompt in a single request.
+
+    The prompt is sent (and billed) once and the API returns n choices, which
+    is much cheaper than n separate calls with the same long prompt.
+    `followup` holds extra conversation turns sent after the prompt.
+    """
+    # please use your own openai api key (OPENAI_API_KEY in .env).
+    messages = _build_messages(prompt, system, followup)
+    key = _cache_key(messages, max_tokens, temperature, response_format, n, model)
+    if key in _response_cache:
+        return _response_cache[key]
+
+    extra = {"response_format": response_format} if response_format is not None else {}
+    async with _request_semaphore:
+        resp = await get_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=False,
+            n=n,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **extra,
+        )
+    texts = [choice.message.content or "" for choice in resp.choices]
+    _response_cache[key] = texts
+    return texts
+
+
+async def acall_model(
+    prompt: str,
+    system: str | None = None,
+    max_tokens=3000,
+    temperature=0.1,
+    response_format: dict | None = None,
+    model: str = MODEL,
+    followup: list[dict] | None = None,
+) -> str:
+    choices = await acall_model_choices(
+        prompt,
+        system=system,
         max_tokens=max_tokens,
         temperature=temperature,
+        response_format=response_format,
+        model=model,
+        followup=followup,
     )
-    return resp.choices[0].message["content"]  # type: ignore
+    return choices[0]
+
+
+async def astream_model(
+    prompt: str,
+    system: str | None = None,
+    max_tokens=3000,
+    temperature=0.1,
+    echo: bool = False,
+    model: str = MODEL,
+) -> str:
+    """
+    Streaming variant of acall_model.
+
+    With echo=True, tokens are printed to the console as they arrive, so the
+    reader sees the story after the first token instead of after the full
+    generation.
+    """
+    messages = _build_messages(prompt, system)
+    key = _cache_key(messages, max_tokens, temperature, model=model)
+    if key in _response_cache:
+        text = _response_cache[key][0]
+        if echo:
+            print(text, flush=True)
+        return text
+
+    parts: list[str] = []
+    async with _request_semaphore:
+        resp = await get_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+        async for chunk in resp:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            parts.append(delta)
+            if echo:
+                print(delta, end="", flush=True)
+    if echo:
+        print()
+
+    text = "".join(parts)
+    _response_cache[key] = [text]
+    return text
+
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+async def aembed(text: str) -> list[float]:
+    """
+    Embed text with the OpenAI embeddings API and L2-normalize the vector,
+    so cosine similarity reduces to a plain dot product.
+    """
+    async with _request_semaphore:
+        resp = await get_client().embeddings.create(model=EMBEDDING_MODEL, input=text)
+    vec = resp.data[0].embedding
+    norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+    return [x / norm for x in vec]
+
+
+@dataclass
+class CacheConfig:
+    """
+    Settings for a semantic cache. Creative agents that want novelty on
+    every call can simply set enabled=False.
+    """
+    enabled: bool = True
+    similarity_threshold: float = 0.92
+
+
+class SemanticCache:
+    """
+    Tiny in-memory semantic cache for free-form requests.
+
+    Entries are stored as normalized embeddings alongside their cached
+    responses, so "a dragon scared of the dark" and "a dragon who is afraid
+    of the dark" can hit the same entry.
+
+    The cache is small (one console session), so a linear dot-product scan
+    is fast enough and avoids pulling in a vector index library.
+    """
+
+    def __init__(self, config: CacheConfig):
+        self.config = config
+        self._vectors: list[list[float]] = []
+        self._values: list[str] = []
+
+    def search(self, vec: list[float]) -> str | None:
+        """Return the most similar cached value above the threshold, if any."""
+        best_score, best_value = -1.0, None
+        for cached_vec, value in zip(self._vectors, self._values):
+            score = sum(a * b for a, b in zip(vec, cached_vec))
+            if score > best_score:
+                best_score, best_value = score, value
+        if best_score > self.config.similarity_threshold:
+            return best_value
+        return None
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, vec: list[float], value: str) -> None:
+        self._vectors.append(vec)
+        self._values.append(value)
+
+    def to_dict(self) -> dict:
+        return {
+            "vectors": self._vectors,
+            "values": self._values,
+        }
+
+    def load_dict(self, data: dict) -> None:
+        self._vectors = list(data.get("vectors", []))
+        self._values = list(data.get("values", []))
+
+
+# Semantic cache for the child's story request. It uses a looser threshold so
+# common themes hit the pre-warmed stories.
+WRITER_CACHE = SemanticCache(CacheConfig(similarity_threshold=0.88))
+
+# Pre-warmed caches written by scripts/warm_cache.py.
+WARM_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "story_cache.json")
+
+
+def save_caches(path: str = WARM_CACHE_PATH) -> None:
+    """
+    Persist the writer's semantic cache and the exact-match response cache.
+
+    Together they let a later session replay a whole pipeline run (draft,
+    revisions, judgements) for a similar request without any LLM calls.
+
+    The file is written to a temporary file in the same directory and then
+    atomically swapped in, so an interrupted save never leaves a truncated
+    cache behind.
+    """
+    data = {"writer_cache": WRITER_CACHE.to_dict(), "response_cache": _response_cache}
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def load_caches(path: str = WARM_CACHE_PATH) -> bool:
+    """
+    Load caches saved by save_caches, if the file exists.
+    Returns True when caches were loaded.
+
+    The cache is only an optimization, so an unreadable or corrupt file is
+    reported and ignored rather than stopping the story app.
+    """
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        writer_cache = data.get("writer_cache", {})
+        response_cache = data.get("response_cache", {})
+    except (OSError, json.JSONDecodeError, AttributeError) as e:
+        print(f"Warning: ignoring unreadable story cache {path}: {e}", file=sys.stderr)
+        return False
+    WRITER_CACHE.load_dict(writer_cache)
+    _response_cache.update(response_cache)
+    return True
+
 
 # example_requests = "A story about a girl named Alice and her best friend Bob, who happens to be a cat."
 
+# Each agent's prompt is split into a static SYSTEM part (identical on every
+# call) and a dynamic USER part holding the request/story. The static
+# instructions come first as a stable prefix. OpenAI only caches prefixes of
+# 1024+ tokens, which these prompts are well below today, so this only pays
+# off if the instructions (e.g. with few-shot examples) grow past that size.
+
 # Story writer (first agent) – creates the initial bedtime story draft.
-STORY_WRITER_PROMPT = """
+STORY_WRITER_SYSTEM_PROMPT = """
 You are an expert children's author.
 
 Write a bedtime story for a child aged between 5 and 10 years old.
@@ -50,19 +369,24 @@ Requirements:
 - A small, non-scary problem that gets resolved positively.
 - Include a short 1–2 sentence moral at the end starting with "Moral:".
 
+Write ONLY the story. Do not add any explanation or commentary.
+"""
+
+STORY_WRITER_PROMPT = """
 The child's story request is:
 "{user_request}"
-
-Now write ONLY the story. Do not add any explanation or commentary.
 """
 
 # Judge (second agent) – evaluates a story and returns structured JSON feedback.
-JUDGE_PROMPT = """
+JUDGE_SYSTEM_PROMPT = """
 You are a strict but kind editorial judge for children's bedtime stories (ages 5–10).
 
-Your job is to review the story below and return a JSON object ONLY, with no extra text.
+Your job is to review the story you are given and return a JSON object ONLY, with no extra text.
+
+Start with a "reasoning" field: brief notes on each criterion below (under 60 words
+in total), written BEFORE you decide on any scores.
 
-Evaluate the story on:
+Then evaluate the story on:
 - clarity (0–10)
 - age_appropriateness (0–10)
 - emotional_safety (0–10)
@@ -75,25 +399,29 @@ Also include:
 - suggested_fixes: a short list of specific, actionable improvements
 
 Return JSON in this format ONLY:
-{{
-  "clarity": 9,
-  "age_appropriateness": 10,
-  "emotional_safety": 9,
-  "creativity": 8,
-  "narrative_structure": 9,
-  "total_score": 45,
-  "issues": ["issue 1", "issue 2"],
-  "suggested_fixes": ["fix 1", "fix 2"]
-}}
+{"reasoning":"clarity: ...; age: ...; safety: ...; creativity: ...; structure: ...","clarity":9,"age_appropriateness":10,"emotional_safety":9,"creativity":8,"narrative_structure":9,"total_score":45,"issues":["..."],"suggested_fixes":["..."]}
+"""
 
+JUDGE_PROMPT = """
 Here is the story to judge:
 \"\"\"{story}\"\"\"
 """
 
 # Revision agent (third agent) – rewrites the story to address judge feedback.
-REVISION_PROMPT = """
+REVISION_SYSTEM_PROMPT = """
 You are revising a children's bedtime story for ages 5–10.
 
+You will be given the original story and feedback from a quality judge.
+Rewrite the story to address this feedback while:
+- Keeping it between 350–600 words
+- Preserving the core theme and characters
+- Making it even clearer, kinder, and more engaging
+- Ending with a short moral that starts with "Moral:"
+
+Return ONLY the improved story, with no explanation or comments.
+"""
+
+REVISION_PROMPT = """
 Original story:
 \"\"\"{story}\"\"\"
 
@@ -104,26 +432,13 @@ Issues:
 
 Suggested fixes:
 {fixes}
-
-Rewrite the story to address this feedback while:
-- Keeping it between 350–600 words
-- Preserving the core theme and characters
-- Making it even clearer, kinder, and more engaging
-- Ending with a short moral that starts with "Moral:"
-
-Return ONLY the improved story, with no explanation or comments.
 """
 
 # User-feedback agent – rewrites the story based on human feedback from the console.
-USER_FEEDBACK_PROMPT = """
+USER_FEEDBACK_SYSTEM_PROMPT = """
 You are a children's story rewriter.
 
-Here is the current story:
-\"\"\"{story}\"\"\"
-
-Here is additional feedback from the human reader:
-\"\"\"{feedback}\"\"\"
-
+You will be given the current story and feedback from the human reader.
 Rewrite the story to incorporate this feedback while:
 - Keeping it appropriate and emotionally safe for ages 5–10
 - Keeping roughly the same length
@@ -133,39 +448,152 @@ Rewrite the story to incorporate this feedback while:
 Return ONLY the new story.
 """
 
+USER_FEEDBACK_PROMPT = """
+Here is the current story:
+\"\"\"{story}\"\"\"
+
+Here is additional feedback from the human reader:
+\"\"\"{feedback}\"\"\"
+"""
+
+
+def _split_template(template: str, *fields: str) -> tuple[str, ...]:
+    """
+    Pre-split a prompt template on its {field} placeholders (in order), so
+    filling it later is plain string concatenation instead of str.format
+    re-parsing the template on every call.
+    """
+    pieces = []
+    rest = template
+    for field in fields:
+        head, rest = rest.split("{" + field + "}")
+        pieces.append(head)
+    pieces.append(rest)
+    return tuple(pieces)
 
-def generate_initial_story(user_request: str) -> str:
+
+def _fill(pieces: tuple[str, ...], *values: str) -> str:
+    """Interleave the pre-split template pieces with the given values."""
+    parts = [pieces[0]]
+    for value, piece in zip(values, pieces[1:]):
+        parts.append(value)
+        parts.append(piece)
+    return "".join(parts)
+
+
+# Templates are split once at import time.
+_STORY_WRITER_PIECES = _split_template(STORY_WRITER_PROMPT, "user_request")
+_JUDGE_PIECES = _split_template(JUDGE_PROMPT, "story")
+_REVISION_PIECES = _split_template(REVISION_PROMPT, "story", "issues", "fixes")
+_USER_FEEDBACK_PIECES = _split_template(USER_FEEDBACK_PROMPT, "story", "feedback")
+
+
+async def generate_initial_story(user_request: str, record: bool = False) -> str:
     """
-    Use the STORY_WRITER_PROMPT to generate the first draft
+    Use the STORY_WRITER prompts to generate the first draft
     of a bedtime story based on the user's request.
+
+    Semantically similar requests are served from WRITER_CACHE when enabled.
+    The request is only embedded when that can pay off: when the cache has
+    entries to search, or when `record=True` (scripts/warm_cache.py) asks for
+    the new draft to be stored for later sessions.
+    """
+    enabled = WRITER_CACHE.config.enabled
+    lookup = enabled and len(WRITER_CACHE) > 0
+    record = enabled and record
+    vec = await aembed(user_request) if lookup or record else None
+
+    if lookup:
+        cached = WRITER_CACHE.search(vec)
+        if cached is not None:
+            return cached
+
+    prompt = _fill(_STORY_WRITER_PIECES, user_request)
+    story = await acall_model(
+        prompt,
+        system=STORY_WRITER_SYSTEM_PROMPT,
+        max_tokens=STORY_MAX_TOKENS,
+        temperature=WRITER_TEMPERATURE,
+        model=WRITER_MODEL,
+    )
+
+    if record:
+        WRITER_CACHE.add(vec, story)
+    return story
+
+
+# Room for the brief reasoning notes plus the scores and issue/fix lists.
+JUDGE_MAX_TOKENS = 350
+JUDGE_TEMPERATURE = 0
+JUDGE_RESPONSE_FORMAT = {"type": "json_object"}
+
+JUDGE_SCORE_FIELDS = (
+    "clarity",
+    "age_appropriateness",
+    "emotional_safety",
+    "creativity",
+    "narrative_structure",
+)
+
+
+# Sent as a follow-up user turn, after the judge's unusable reply (cut off at
+# max_tokens, or missing/misnaming a score field), asking for a shorter,
+# complete JSON object with the exact field names.
+JUDGE_RETRY_PROMPT = """
+Your previous reply was not a complete JSON object with every score field. Return ONLY the JSON object, using exactly the field names from the format in your instructions, and keep reasoning, issues and suggested_fixes short.
+"""
+
+
+def _load_judge_json(raw: str) -> dict | None:
+    """Decode the judge's reply, or return None if it isn't a JSON object."""
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def is_complete_judge_reply(raw: str) -> bool:
+    """
+    True if the judge's reply is a JSON object with every score field.
+
+    JSON mode guarantees valid JSON but not the key names, so a reply with a
+    misnamed or missing score (which would silently count as 0) is treated
+    as unusable too.
     """
-    prompt = STORY_WRITER_PROMPT.format(user_request=user_request)
-    return call_model(prompt, max_tokens=900, temperature=0.8)
+    data = _load_judge_json(raw)
+    return data is not None and all(field in data for field in JUDGE_SCORE_FIELDS)
+
+
+def _as_str_list(value) -> list[str]:
+    """Coerce a judge list field (which may be null, a string, ...) to a list of strings."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, list):
+        return [str(item) for item in value if item is not None]
+    return [str(value)]
 
 
 def parse_judge_response(raw: str) -> dict:
     """
-    Robustly parse the judge's JSON response from raw text.
+    Parse the judge's JSON response.
 
-    The judge is instructed to return JSON only, but LLMs can sometimes
-    add extra text. We attempt to locate the first '{' and last '}' and
-    parse that substring as JSON.
+    The judge runs in JSON mode, so the response is always a JSON object and
+    no text scanning is needed. Its "reasoning" scratchpad only exists to make
+    the scores more accurate, so it is dropped here. Scores are clamped to
+    0–10 and total_score is recomputed from them, so a slightly off judge
+    can't skew the pipeline.
 
-    On failure, we return a "safe" fallback object with a total_score of 0
-    and generic suggestions, so the pipeline can still proceed.
+    If the response is still unusable (e.g. cut off at max_tokens), we return
+    a "safe" fallback object with a total_score of 0 and generic suggestions,
+    so the pipeline can still proceed.
     """
-    try:
-        start = raw.index("{")
-        end = raw.rfind("}")
-        json_str = raw[start:end + 1]
-        return json.loads(json_str)
-    except Exception:
+    data = _load_judge_json(raw)
+    if data is None:
         return {
-            "clarity": 0,
-            "age_appropriateness": 0,
-            "emotional_safety": 0,
-            "creativity": 0,
-            "narrative_structure": 0,
+            **{field: 0 for field in JUDGE_SCORE_FIELDS},
             "total_score": 0,
             "issues": ["Could not parse judge response as JSON."],
             "suggested_fixes": [
@@ -173,48 +601,143 @@ def parse_judge_response(raw: str) -> dict:
             ],
         }
 
+    data.pop("reasoning", None)
+    for field in JUDGE_SCORE_FIELDS:
+        try:
+            data[field] = max(0, min(10, int(data.get(field, 0))))
+        except (TypeError, ValueError):
+            data[field] = 0
+    data["total_score"] = sum(data[field] for field in JUDGE_SCORE_FIELDS)
+    data["issues"] = _as_str_list(data.get("issues"))
+    data["suggested_fixes"] = _as_str_list(data.get("suggested_fixes"))
+    return data
 
-def judge_story(story: str) -> dict:
+
+async def judge_story(story: str) -> dict:
     """
     Send the story to the judge agent and return its parsed JSON feedback.
+
+    The call uses OpenAI JSON mode so the reply is guaranteed to be valid JSON,
+    and temperature 0 so scoring is consistent (and repeat judgements of the
+    same story hit the response cache).
+
+    If the reply is unusable (truncated, or missing a score field), the judge
+    is asked once more with a corrective note, rather than letting a zero
+    score trigger a needless revision round.
     """
-    prompt = JUDGE_PROMPT.format(story=story)
-    raw = call_model(prompt, max_tokens=600, temperature=0.2)
+    async def ask(prompt: str, followup: list[dict] | None = None) -> str:
+        return await acall_model(
+            prompt,
+            system=JUDGE_SYSTEM_PROMPT,
+            max_tokens=JUDGE_MAX_TOKENS,
+            temperature=JUDGE_TEMPERATURE,
+            response_format=JUDGE_RESPONSE_FORMAT,
+            model=JUDGE_MODEL,
+            followup=followup,
+        )
+
+    prompt = _fill(_JUDGE_PIECES, story)
+    raw = await ask(prompt)
+    if not is_complete_judge_reply(raw):
+        # Show the judge its bad reply, then ask for a corrected one
+        raw = await ask(prompt, followup=[
+            {"role": "assistant", "content": raw},
+            {"role": "user", "content": JUDGE_RETRY_PROMPT},
+        ])
     return parse_judge_response(raw)
 
 
-def revise_story(story: str, judge_data: dict) -> str:
+def build_revision_prompt(story: str, judge_data: dict) -> str:
+    """
+    Fill the REVISION_PROMPT for a story and its judge feedback, flattening
+    the "issues" and "suggested_fixes" lists into bullet-point text.
+    """
+    issues_text = "\n".join(f"- {i}" for i in judge_data.get("issues", []))
+    fixes_text = "\n".join(
+        f"- {f}" for f in judge_data.get("suggested_fixes", []))
+
+    return _fill(
+        _REVISION_PIECES,
+        story,
+        issues_text or "- (no issues listed)",
+        fixes_text or "- (no fixes listed)",
+    )
+
+
+async def revise_story(story: str, judge_data: dict, n: int = 4) -> list[str]:
     """
     Use the REVISION_PROMPT to improve a story based on judge feedback.
 
     - Flattens the "issues" and "suggested_fixes" lists into bullet-point text
       so the LLM can easily consume them.
+    - Returns `n` candidate revisions sampled from a single request, so the
+      long prompt (full story + feedback) is only billed once.
     """
-    issues_text = "\n".join(f"- {i}" for i in judge_data.get("issues", []))
-    fixes_text = "\n".join(
-        f"- {f}" for f in judge_data.get("suggested_fixes", []))
+    prompt = build_revision_prompt(story, judge_data)
+    return await acall_model_choices(
+        prompt,
+        system=REVISION_SYSTEM_PROMPT,
+        n=n,
+        max_tokens=STORY_MAX_TOKENS,
+        temperature=REWRITE_TEMPERATURE,
+        model=WRITER_MODEL,
+    )
+
 
-    prompt = REVISION_PROMPT.format(
-        story=story,
-        issues=issues_text or "- (no issues listed)",
-        fixes=fixes_text or "- (no fixes listed)",
+async def apply_user_feedback(story: str, feedback: str, echo: bool = False) -> str:
+    """
+    Use the USER_FEEDBACK_PROMPT to rewrite a story based on human feedback.
+
+    With echo=True the new story is streamed to the console.
+    """
+    prompt = _fill(_USER_FEEDBACK_PIECES, story, feedback)
+    return await astream_model(
+        prompt,
+        system=USER_FEEDBACK_SYSTEM_PROMPT,
+        max_tokens=STORY_MAX_TOKENS,
+        temperature=REWRITE_TEMPERATURE,
+        model=WRITER_MODEL,
+        echo=echo,
     )
-    return call_model(prompt, max_tokens=900, temperature=0.7)
 
 
-def story_pipeline(user_request: str, min_score: int = 40, max_rounds: int = 3, verbose: bool = True):
+# Default pipeline settings (also used by scripts/batch_eval.py).
+MIN_SCORE = 40
+MAX_ROUNDS = 3
+NUM_CANDIDATES = 4
+MIN_IMPROVEMENT = 2
+
+
+async def story_pipeline(
+    user_request: str,
+    min_score: int = MIN_SCORE,
+    max_rounds: int = MAX_ROUNDS,
+    num_candidates: int = NUM_CANDIDATES,
+    min_improvement: int = MIN_IMPROVEMENT,
+    verbose: bool = True,
+    record_cache: bool = False,
+):
     """
     Multi-round pipeline that orchestrates:
     1. Initial story generation
     2. Judging
-    3. Iterative revisions until score >= min_score or max_rounds is reached.
+    3. Iterative revisions until score >= min_score or max_rounds is reached,
+       or until a round improves the score by less than `min_improvement`
+       (further rounds are unlikely to be worth their latency and tokens).
+
+    Each revision round samples `num_candidates` revisions from a single
+    request, judges them all in parallel, and keeps the highest-scoring
+    candidate (best-of-N).
+
+    With record_cache=True the first draft is stored in WRITER_CACHE (used
+    by scripts/warm_cache.py to build the pre-warmed cache).
 
     Returns:
       - final_story: str
       - final_judge_data: dict
     """
-    story = generate_initial_story(user_request)
-    judge_data = judge_story(story)
+    story = await generate_initial_story(user_request, record=record_cache)
+    judge_data = await judge_story(story)
 
     if verbose:
         print("\n--- Judge evaluation: round 1 ---")
@@ -224,20 +747,35 @@ def story_pipeline(user_request: str, min_score: int = 40, max_rounds: int = 3,
     round_idx = 1
     while judge_data.get("total_score", 0) < min_score and round_idx < max_rounds:
         round_idx += 1
-        story = revise_story(story, judge_data)
-        judge_data = judge_story(story)
+        prev_score = judge_data.get("total_score", 0)
+        candidates = await revise_story(story, judge_data, n=num_candidates)
+        scores = await asyncio.gather(*[judge_story(c) for c in candidates])
+        best_story, best_judge_data = max(
+            zip(candidates, scores),
+            key=lambda pair: pair[1].get("total_score", 0),
+        )
+        new_score = best_judge_data.get("total_score", 0)
 
         if verbose:
             print(f"--- Judge evaluation: round {round_idx} ---")
-            print("Score:", judge_data.get("total_score"))
-            print("Issues:", judge_data.get("issues"), "\n")
+            print("Score:", new_score)
+            print("Issues:", best_judge_data.get("issues"), "\n")
+
+        # Never trade the current story for a worse revision.
+        if new_score >= prev_score:
+            story, judge_data = best_story, best_judge_data
+
+        if new_score - prev_score < min_improvement:
+            if verbose:
+                print("Score gain below threshold; stopping revisions early.\n")
+            break
 
     return story, judge_data
 
 
-def main():
+async def amain():
     """
-    Entry point for the script.
+    Async entry point for the script.
 
     Flow:
     1) Ask the user what kind of story they want.
@@ -252,16 +790,21 @@ def main():
     """
     print("Welcome to the Bedtime Story Maker (ages 5–10) 🌙\n")
 
+    # Serve common themes instantly from the pre-warmed story cache, if present
+    load_caches()
+
     user_request = input(
         "What kind of story would you like?\n"
         "(For example: 'A dragon who is afraid of the dark but learns to be brave')\n> "
     )
 
     # Run through the story → judge → refine pipeline
-    final_story, final_judge_data = story_pipeline(
+    final_story, final_judge_data = await story_pipeline(
         user_request=user_request,
-        min_score=40,      # threshold out of 50
-        max_rounds=3,      # up to 3 judge/refinement cycles
+        min_score=MIN_SCORE,              # threshold out of 50
+        max_rounds=MAX_ROUNDS,            # up to 3 judge/refinement cycles
+        num_candidates=NUM_CANDIDATES,    # revision drafts sampled per round (best-of-N)
+        min_improvement=MIN_IMPROVEMENT,  # stop early if a round gains fewer points than this
         verbose=True,
     )
 
@@ -302,30 +845,18 @@ def main():
             print("Goodnight! 🌙")
             break
 
-        # Rewrite story based on user feedback
-        feedback_prompt = USER_FEEDBACK_PROMPT.format(
-            story=current_story,
-            feedback=user_feedback,
-        )
-
-        updated_story = call_model(
-            feedback_prompt,
-            max_tokens=900,
-            temperature=0.7,
-        )
+        # Rewrite story based on user feedback, streaming it to the console
+        print("\n========= UPDATED STORY =========\n")
+        updated_story = await apply_user_feedback(current_story, user_feedback, echo=True)
+        print("\n=================================\n")
 
         # Re-run the judge on the updated story
-        updated_judge_data = judge_story(updated_story)
+        updated_judge_data = await judge_story(updated_story)
 
         # Update current story & judge data
         current_story = updated_story
         current_judge_data = updated_judge_data
 
-        # Show updated story + updated judge evaluation
-        print("\n========= UPDATED STORY =========\n")
-        print(current_story)
-        print("\n=================================\n")
-
         print("--- Judge evaluation for updated story ---")
         print("Total score:", updated_judge_data.get("total_score"))
         issues = updated_judge_data.get("issues", [])
@@ -336,5 +867,26 @@ def main():
             print("Issues: (none reported)")
         print()
 
+
+async def _run_session():
+    """
+    Run one interactive session on the shared client, then close the client
+    so its pooled keep-alive connections are shut down cleanly.
+    """
+    try:
+        await amain()
+    finally:
+        await close_client()
+
+
+def main():
+    """
+    Entry point for the script: drives the async story session with asyncio.
+    """
+    if not os.getenv("OPENAI_API_KEY"):
+        sys.exit("OPENAI_API_KEY is not set. Add it to a .env file or your environment and try again.")
+    asyncio.run(_run_session())
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,237 @@
+"""
+Offline evaluation of the story pipeline using the OpenAI Batch API.
+
+Mirrors story_pipeline with chained batches: every eval prompt is drafted by
+the writer and judged; then, for up to MAX_ROUNDS - 1 rounds, stories still
+below the target score get NUM_CANDIDATES revisions (one n=N request each),
+every candidate is judged, and the best one is kept, with the same early-exit
+rule as story_pipeline. Batch requests cost half as much as regular calls and
+don't count against the interactive rate limits, which makes them a good fit
+for regression runs over many prompts (results usually arrive within minutes,
+with a 24h worst case).
+
+Usage (from the repository root):
+    python scripts/batch_eval.py [prompts.txt] [--min-mean SCORE]
+
+prompts.txt holds one story request per line; without it the seed requests
+from scripts/warm_cache.py are used. The script exits with status 1 if any
+story could not be generated or judged, or if --min-mean is given and the
+mean final score falls below it, so it can gate a CI run.
+"""
+import os
+import sys
+import json
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from warm_cache import SEED_REQUESTS  # noqa: E402
+
+POLL_INTERVAL_SECONDS = 30
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def writer_body(user_request: str) -> dict:
+    """Chat completion payload matching generate_initial_story."""
+    prompt = main._fill(main._STORY_WRITER_PIECES, user_request)
+    return {
+        "model": main.WRITER_MODEL,
+        "messages": main._build_messages(prompt, main.STORY_WRITER_SYSTEM_PROMPT),
+        "max_tokens": main.STORY_MAX_TOKENS,
+        "temperature": main.WRITER_TEMPERATURE,
+    }
+
+
+def revision_body(story: str, judge_data: dict, n: int) -> dict:
+    """Chat completion payload matching revise_story."""
+    prompt = main.build_revision_prompt(story, judge_data)
+    return {
+        "model": main.WRITER_MODEL,
+        "messages": main._build_messages(prompt, main.REVISION_SYSTEM_PROMPT),
+        "n": n,
+        "max_tokens": main.STORY_MAX_TOKENS,
+        "temperature": main.REWRITE_TEMPERATURE,
+    }
+
+
+def judge_body(story: str) -> dict:
+    """Chat completion payload matching judge_story."""
+    prompt = main._fill(main._JUDGE_PIECES, story)
+    return {
+        "model": main.JUDGE_MODEL,
+        "messages": main._build_messages(prompt, main.JUDGE_SYSTEM_PROMPT),
+        "max_tokens": main.JUDGE_MAX_TOKENS,
+        "temperature": main.JUDGE_TEMPERATURE,
+        "response_format": main.JUDGE_RESPONSE_FORMAT,
+    }
+
+
+async def run_batch(requests: dict[str, dict], description: str) -> dict[str, list[str]]:
+    """
+    Submit {custom_id: body} as one batch, wait for it to finish and return
+    {custom_id: [message content per choice]} for every request that
+    succeeded. An empty request set is not submitted (the API rejects it).
+    """
+    if not requests:
+        return {}
+
+    client = main.get_client()
+    lines = [
+        json.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body})
+        for custom_id, body in requests.items()
+    ]
+    batch_file = await client.files.create(
+        file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch",
+    )
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+        metadata={"description": description},
+    )
+    print(f"Submitted {description} batch {batch.id} ({len(requests)} requests)")
+
+    while batch.status not in TERMINAL_STATUSES:
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+        batch = await client.batches.retrieve(batch.id)
+        counts = batch.request_counts
+        if counts is not None:
+            print(f"  {batch.status}: {counts.completed}/{counts.total} done, {counts.failed} failed")
+
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"{description} batch {batch.id} ended with status {batch.status!r}")
+
+    output = await client.files.content(batch.output_file_id)
+    results = {}
+    for line in output.text.splitlines():
+        item = json.loads(line)
+        response = item.get("response") or {}
+        if response.get("status_code") != 200:
+            continue
+        results[item["custom_id"]] = [
+            choice["message"]["content"] or "" for choice in response["body"]["choices"]
+        ]
+    return results
+
+
+async def judge_all(stories: dict[str, str], description: str) -> dict[str, dict]:
+    """
+    Judge {custom_id: story} in one batch. Replies that are missing or
+    unusable are left out, rather than counted as a 0 score.
+    """
+    replies = await run_batch({cid: judge_body(story) for cid, story in stories.items()}, description)
+    return {
+        cid: main.parse_judge_response(choices[0])
+        for cid, choices in replies.items()
+        if main.is_complete_judge_reply(choices[0])
+    }
+
+
+async def batch_eval(
+    user_requests: list[str],
+    min_score: int = main.MIN_SCORE,
+    max_rounds: int = main.MAX_ROUNDS,
+    num_candidates: int = main.NUM_CANDIDATES,
+    min_improvement: int = main.MIN_IMPROVEMENT,
+) -> list[int | None]:
+    """
+    Run the pipeline over all requests and return each final score
+    (None for requests whose draft could not be generated or judged).
+    """
+    ids = [f"story-{i}" for i in range(len(user_requests))]
+    drafts = await run_batch(
+        {cid: writer_body(r) for cid, r in zip(ids, user_requests)},
+        "bedtime story writer eval",
+    )
+    stories = {cid: choices[0] for cid, choices in drafts.items()}
+    judgements = await judge_all(stories, "bedtime story judge eval")
+    rounds = {cid: 1 for cid in judgements}
+
+    active = {cid for cid, jd in judgements.items() if jd["total_score"] < min_score}
+    for round_idx in range(2, max_rounds + 1):
+        if not active:
+            break
+        revisions = await run_batch(
+            {cid: revision_body(stories[cid], judgements[cid], num_candidates) for cid in active},
+            f"bedtime story revision eval (round {round_idx})",
+        )
+        candidates = {
+            f"{cid}-cand-{j}": text
+            for cid, texts in revisions.items()
+            for j, text in enumerate(texts)
+        }
+        candidate_judgements = await judge_all(
+            candidates, f"bedtime story re-judge eval (round {round_idx})"
+        )
+
+        next_active = set()
+        for cid in active:
+            scored = [
+                (candidates[k], jd)
+                for k, jd in candidate_judgements.items()
+                if k.startswith(f"{cid}-cand-")
+            ]
+            if not scored:
+                continue
+            rounds[cid] = round_idx
+            best_story, best_judge_data = max(scored, key=lambda pair: pair[1]["total_score"])
+            prev_score = judgements[cid]["total_score"]
+            new_score = best_judge_data["total_score"]
+            # Same selection and early-exit rules as story_pipeline
+            if new_score >= prev_score:
+                stories[cid], judgements[cid] = best_story, best_judge_data
+            if new_score - prev_score >= min_improvement and judgements[cid]["total_score"] < min_score:
+                next_active.add(cid)
+        active = next_active
+
+    final_scores = []
+    print("\n================= EVAL RESULTS =================")
+    for cid, user_request in zip(ids, user_requests):
+        if cid not in judgements:
+            final_scores.append(None)
+            print(f"  FAILED  {user_request}")
+            continue
+        score = judgements[cid]["total_score"]
+        final_scores.append(score)
+        print(f"  {score:>2}/50  ({rounds[cid]} round(s))  {user_request}")
+    return final_scores
+
+
+async def run(user_requests: list[str], min_mean: float | None) -> int:
+    """Run the eval and return the process exit code."""
+    try:
+        final_scores = await batch_eval(user_requests)
+    finally:
+        await main.close_client()
+
+    scores = [s for s in final_scores if s is not None]
+    failed = len(final_scores) - len(scores)
+    mean = sum(scores) / len(scores) if scores else 0.0
+    if scores:
+        print(f"\nMean score: {mean:.1f}/50 over {len(scores)} stories")
+    if failed:
+        print(f"{failed} stories FAILED to generate or judge")
+        return 1
+    if min_mean is not None and mean < min_mean:
+        print(f"Mean score {mean:.1f} is below --min-mean {min_mean}")
+        return 1
+    return 0
+
+
+def load_requests(path: str | None) -> list[str]:
+    if path is None:
+        return SEED_REQUESTS
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("prompts", nargs="?", help="file with one story request per line")
+    parser.add_argument("--min-mean", type=float, default=None,
+                        help="exit with status 1 if the mean final score is below this")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(load_requests(args.prompts), args.min_mean)))
@@ -0,0 +1,60 @@
+"""
+Pre-generate stories for common bedtime-story themes and save them to the
+on-disk cache (story_cache.json), so the first request for a popular theme is
+served instantly instead of waiting on several LLM round-trips.
+
+Usage (from the repository root):
+    python scripts/warm_cache.py [--refresh]
+
+By default the existing story_cache.json is loaded first, so an interrupted
+run resumes where it stopped and seeds that are already cached cost nothing.
+Pass --refresh to ignore the existing file and regenerate every seed story.
+"""
+import os
+import sys
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+# Curated requests covering the themes kids ask for most often.
+SEED_REQUESTS = [
+    "A dragon who is afraid of the dark but learns to be brave",
+    "A princess who makes friends with a shy dragon",
+    "Two best friends who have an argument and make up",
+    "A sleepy bunny who can't fall asleep",
+    "A talking cat who goes on an adventure",
+    "A little bear who loses his favorite blanket",
+    "A unicorn who helps a lost star find its way home",
+    "A puppy's first day at school",
+    "A brave little mouse who helps a lion",
+    "A robot who wants to learn how to dream",
+    "A girl who can talk to animals in the forest",
+    "A boy who builds a spaceship to visit the moon",
+    "An owl who is scared of flying at night",
+    "A tiny seed that grows into a big tree",
+    "A friendly monster who lives under the bed",
+    "A mermaid who finds a magic shell",
+    "A teddy bear who comes to life at night",
+    "A turtle who wants to win a race",
+    "A fairy who loses her wings",
+    "A family of penguins getting ready for bed",
+]
+
+
+async def warm_cache(refresh: bool = False):
+    if not refresh:
+        main.load_caches()
+    try:
+        for i, request in enumerate(SEED_REQUESTS, start=1):
+            story, judge_data = await main.story_pipeline(request, verbose=False, record_cache=True)
+            print(f"[{i}/{len(SEED_REQUESTS)}] score {judge_data.get('total_score')}: {request}")
+            # Save after every story so an interrupted run keeps its progress
+            main.save_caches()
+    finally:
+        await main.close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(warm_cache(refresh="--refresh" in sys.argv[1:]))